@@ -1,38 +1,78 @@
 import sys
 import os
+import atexit
+import codecs
 import json
 import time
-import csv
+import functools
+import re
+import base64
 import ssl
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from urllib.parse import quote_plus, urlencode
-from urllib.request import urlopen, Request
+from urllib.parse import quote_plus, unquote, urlencode, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
 from urllib.error import URLError, HTTPError
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+# Fastest available JSON decoder; all of them accept bytes directly
+if orjson is not None:
+    _json_loads = orjson.loads
+else:
+    try:
+        import ujson  # type: ignore
+    except ImportError:
+        _json_loads = json.loads
+    else:
+        _json_loads = ujson.loads
+
+
+def _split_lines(text: str) -> list[str]:
+    # Universal newlines like text-mode readlines(); str.splitlines() would
+    # also break on \x0b, \x0c, \x1c-\x1e, \x85 and \u2028/\u2029.
+    return text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
 
 def read_lines_with_fallback(path: Path):
-    encodings = ["utf-8-sig", "utf-8", "cp1251", "windows-1251", "latin-1"]
-    last_err = None
-    for enc in encodings:
+    # Read the file once and try the candidate encodings on the in-memory bytes
+    raw = path.read_bytes()
+    if raw.startswith(codecs.BOM_UTF8):
         try:
-            with path.open("r", encoding=enc, errors="strict") as f:
-                lines = [ln.strip() for ln in f.readlines()]
-            return enc, lines
-        except Exception as e:
-            last_err = e
+            return "utf-8-sig", _split_lines(raw[len(codecs.BOM_UTF8):].decode("utf-8"))
+        except UnicodeDecodeError:
+            pass
+    for enc in ("utf-8", "cp1251", "latin-1"):
+        try:
+            return enc, _split_lines(raw.decode(enc))
+        except UnicodeDecodeError:
             continue
     # Fallback with replacement to avoid crash
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        lines = [ln.strip() for ln in f.readlines()]
-    return "utf-8(replaced)", lines
+    return "utf-8(replaced)", _split_lines(raw.decode("utf-8", errors="replace"))
+
+
+_COORD_RE = re.compile(r"^\s*[+-]?\d+(?:\.\d+)?\s*,\s*[+-]?\d+(?:\.\d+)?\s*$")
+# Split glued building suffixes ("20с4", "8к2", "стр.1") into separate tokens
+_SUFFIX_RES = [
+    (re.compile(r"(\d[^\s,]*)\s*([сc])(?=\d)", re.IGNORECASE), r"\1 \2"),
+    (re.compile(r"([сc])\s*(\d+)", re.IGNORECASE), r"\1 \2"),
+    (re.compile(r"([кk])\s*(\d+)", re.IGNORECASE), r"\1 \2"),
+    (re.compile(r"(стр(?:\.|оение)?)\s*(\d+)", re.IGNORECASE), r"стр \2"),
+]
+_HOUSE_TOKEN_RE = re.compile(r"\d+[^\s,]*")
+_HOUSE_NORMALIZE_RE = re.compile(r"[^0-9a-zа-я]")
 
 
 def _is_coords(text: str) -> bool:
-    import re
-    return re.match(r"^\s*[+-]?\d+(?:\.\d+)?\s*,\s*[+-]?\d+(?:\.\d+)?\s*$", text) is not None
+    return _COORD_RE.match(text) is not None
 
 
-def _user_agent(email: str | None = None) -> str:
+def _build_user_agent(email: str | None = None) -> str:
     base = "addr2yandex/1.1"
     mail = email or os.environ.get("NOMINATIM_EMAIL") or ""
     mail = mail.strip()
@@ -41,6 +81,13 @@ def _user_agent(email: str | None = None) -> str:
     return base
 
 
+_USER_AGENT = _build_user_agent()
+
+
+def _user_agent(email: str | None = None) -> str:
+    return _build_user_agent(email) if email else _USER_AGENT
+
+
 def _get_ssl_context():
     ctx = getattr(_get_ssl_context, "_ctx", None)
     if ctx is None:
@@ -59,15 +106,178 @@ def _get_ssl_context():
     return ctx
 
 
-def _fetch_json(url: str, *, headers: dict[str, str] | None = None, timeout: float = 20.0):
-    req_headers = {"User-Agent": _user_agent()}
-    if headers:
-        for k, v in headers.items():
-            if v:
-                req_headers[k] = v
-    req = Request(url, headers=req_headers)
-    with urlopen(req, timeout=timeout, context=_get_ssl_context()) as resp:
-        return json.load(resp)
+class _TokenBucket:
+    """
+    Minimal thread-safe token bucket: allows `rate` requests per second with
+    bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_YANDEX_HOST = "geocode-maps.yandex.ru"
+_NOMINATIM_HOST = "nominatim.openstreetmap.org"
+_PHOTON_HOST = "photon.komoot.io"
+
+# Per-host request limits; Nominatim's usage policy allows at most 1 request/s.
+_RATE_LIMITS = {
+    _NOMINATIM_HOST: _TokenBucket(1.0),
+}
+
+
+_local = threading.local()
+
+
+def _https_proxy(host: str) -> tuple[str, dict[str, str]] | None:
+    """
+    Return (proxy host:port, CONNECT headers) from HTTPS_PROXY/https_proxy,
+    or None when no proxy is configured or NO_PROXY excludes the host.
+    """
+    proxy_url = getproxies().get("https")
+    if not proxy_url or proxy_bypass(host):
+        return None
+    if "://" not in proxy_url:
+        proxy_url = "http://" + proxy_url
+    parts = urlsplit(proxy_url)
+    headers = {}
+    if parts.username:
+        creds = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    proxy_host = parts.hostname or ""
+    if ":" in proxy_host:
+        proxy_host = f"[{proxy_host}]"
+    if parts.port:
+        proxy_host += f":{parts.port}"
+    return proxy_host, headers
+
+
+def _get_connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    """
+    Return a keep-alive HTTPS connection for the host, creating it on first use.
+    Reusing the socket saves a TCP+TLS handshake per geocoder request.
+    Connections are not thread-safe, so each worker thread keeps its own pool.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = {}
+        _local.conns = conns
+    conn = conns.get(host)
+    if conn is None:
+        proxy = _https_proxy(host)
+        if proxy is None:
+            conn = http.client.HTTPSConnection(host, timeout=timeout, context=_get_ssl_context())
+        else:
+            # Same proxy settings urlopen honored: CONNECT through the proxy,
+            # then TLS to the real host inside the tunnel.
+            proxy_host, tunnel_headers = proxy
+            conn = http.client.HTTPSConnection(proxy_host, timeout=timeout, context=_get_ssl_context())
+            conn.set_tunnel(host, headers=tunnel_headers)
+        conns[host] = conn
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_connection(host: str) -> None:
+    conns = getattr(_local, "conns", None) or {}
+    conn = conns.pop(host, None)
+    if conn is not None:
+        conn.close()
+
+
+_REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+_MAX_REDIRECTS = 5
+
+
+# Shared, never-mutated header sets so helpers don't rebuild them per request
+_JSON_HEADERS = {
+    "User-Agent": _USER_AGENT,
+    "Connection": "keep-alive",
+    "Accept": "application/json",
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _nominatim_headers(lang: str, email: str | None) -> dict[str, str]:
+    headers = dict(_JSON_HEADERS)
+    headers["User-Agent"] = _user_agent(email)
+    if lang:
+        headers["Accept-Language"] = lang
+    return headers
+
+
+def _fetch_json(
+    host: str,
+    target: str,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float = 20.0,
+):
+    """
+    GET https://<host><target> and decode the JSON body. Callers pass the host
+    and request target separately, so no URL parsing happens per request.
+    `headers` is sent as-is and defaults to _JSON_HEADERS.
+    """
+    req_headers = headers if headers is not None else _JSON_HEADERS
+    for _ in range(_MAX_REDIRECTS + 1):
+        resp, body = _send_request(host, target, req_headers, timeout)
+        location = resp.getheader("Location")
+        if resp.status in _REDIRECT_CODES and location:
+            # Follow redirects like urlopen did, but stay on HTTPS
+            parts = urlsplit(urljoin(f"https://{host}{target}", location))
+            if parts.scheme != "https":
+                raise HTTPError(location, resp.status, resp.reason, resp.headers, None)
+            host = parts.netloc
+            target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+            continue
+        if resp.status != 200:
+            raise HTTPError(f"https://{host}{target}", resp.status, resp.reason, resp.headers, None)
+        return _json_loads(body)
+    raise HTTPError(f"https://{host}{target}", resp.status, "Too many redirects", resp.headers, None)
+
+
+def _send_request(host: str, target: str, headers: dict[str, str], timeout: float):
+    limiter = _RATE_LIMITS.get(host)
+    if limiter is not None:
+        limiter.acquire()
+    # A pooled connection may have been closed by the server while idle;
+    # retry once on a fresh socket before giving up. The retry does not take
+    # another rate-limit token: the first attempt never reached the server.
+    for attempt in range(2):
+        conn = _get_connection(host, timeout)
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError):
+            _drop_connection(host)
+            if attempt:
+                raise
+            continue
+        except Exception:
+            _drop_connection(host)
+            raise
+        if resp.will_close:
+            _drop_connection(host)
+        return resp, body
 
 
 try:
@@ -86,6 +296,8 @@ _GEOCODE_EXCEPTIONS = (
     ValueError,
     json.JSONDecodeError,
     ssl.SSLError,
+    http.client.HTTPException,
+    OSError,
 )
 
 
@@ -107,6 +319,12 @@ def _coords_to_2gis_order(text: str) -> str:
     return f"{lon},{lat}"
 
 
+# Characters quote_plus(..., safe=",") leaves untouched
+_LINK_SAFE_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~,"
+)
+
+
 def build_2gis_link(coords: str) -> str:
     """
     Build a universal 2GIS route link from current location to given coordinates.
@@ -114,35 +332,106 @@ def build_2gis_link(coords: str) -> str:
     usable in browsers as well.
     """
     cleaned = coords.replace(" ", "")
-    encoded = quote_plus(cleaned, safe=",")
+    # Coordinates never need escaping; only free-text targets go through quote_plus
+    if _LINK_SAFE_CHARS.issuperset(cleaned):
+        encoded = cleaned
+    else:
+        encoded = quote_plus(cleaned, safe=",")
     # rsType=bus -> public transport, from/currentLocation -> "my location"
     return f"https://2gis.ru/routeSearch/rsType/bus/from/currentLocation/to/{encoded}"
 
 
-def _cache_path() -> Path:
-    return Path("geocache.json")
+_CACHE_LOCK = threading.Lock()
+# The cache is read from disk once per run, kept in memory and written back
+# by flush_cache() instead of being reloaded and rewritten for every address.
+_CACHE_PATH = Path("geocache.json")
+_CACHE: dict | None = None
+_CACHE_DIRTY = False
+
+
+def _negative_cache_ttl() -> int:
+    try:
+        return max(0, int(os.environ.get("GEOCACHE_FAIL_TTL", "86400")))
+    except ValueError:
+        return 86400
+
+
+# How long (seconds) an address that no geocoder could resolve is skipped;
+# 0 disables negative caching.
+_NEGATIVE_CACHE_TTL = _negative_cache_ttl()
+
+
+def _cache_key(addr: str) -> str:
+    # Case- and whitespace-insensitive so trivially different spellings share an entry
+    return " ".join(addr.split()).lower()
+
+
+_PROVIDER_PREFIXES = ("yandex:", "nominatim:", "photon:")
+
+
+def _migrate_cache(cache: dict) -> tuple[dict, bool]:
+    """
+    Convert caches written by older versions, which stored every result under
+    both "<geocoder>:<address>" and "<address>", to one canonical key per
+    address. Coordinates win over failure markers when keys collide.
+    """
+    migrated: dict = {}
+    for key, value in cache.items():
+        for prefix in _PROVIDER_PREFIXES:
+            if key.startswith(prefix):
+                key = key[len(prefix):]
+                break
+        key = _cache_key(key)
+        if key not in migrated or isinstance(value, list):
+            migrated[key] = value
+    changed = len(migrated) != len(cache) or any(k not in cache for k in migrated)
+    return migrated, changed
 
 
 def _load_cache() -> dict:
-    p = _cache_path()
-    if p.exists():
-        try:
-            return json.loads(p.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+    global _CACHE, _CACHE_DIRTY
+    if _CACHE is None:
+        _CACHE = {}
+        if _CACHE_PATH.exists():
+            try:
+                _CACHE = _json_loads(_CACHE_PATH.read_bytes())
+            except Exception:
+                _CACHE = {}
+        if isinstance(_CACHE, dict):
+            _CACHE, _CACHE_DIRTY = _migrate_cache(_CACHE)
+        else:
+            _CACHE = {}
+    return _CACHE
 
 
 def _save_cache(cache: dict) -> None:
+    tmp = _CACHE_PATH.with_name(_CACHE_PATH.name + ".tmp")
     try:
-        _cache_path().write_text(
-            json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        if orjson is not None:
+            data = orjson.dumps(cache)
+        else:
+            data = json.dumps(cache, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp.write_bytes(data)
+        # Atomic swap so an interrupted write never leaves a truncated cache
+        os.replace(tmp, _CACHE_PATH)
     except Exception:
         # Cache write failure should not break the run
         pass
 
 
+def flush_cache() -> None:
+    """Write the in-memory geocoding cache to disk if it has changed."""
+    global _CACHE_DIRTY
+    with _CACHE_LOCK:
+        if _CACHE is None or not _CACHE_DIRTY:
+            return
+        _save_cache(_CACHE)
+        _CACHE_DIRTY = False
+
+
+atexit.register(flush_cache)
+
+
 def _yandex_geocode(addr: str, apikey: str, lang: str = "ru_RU") -> tuple[float, float] | None:
     params = {
         "apikey": apikey,
@@ -151,28 +440,16 @@ def _yandex_geocode(addr: str, apikey: str, lang: str = "ru_RU") -> tuple[float,
         "results": "1",
         "lang": lang,
     }
-    url = "https://geocode-maps.yandex.ru/1.x/?" + urlencode(params)
     data = _fetch_json(
-        url,
-        headers={
-            "User-Agent": _user_agent(),
-            "Accept": "application/json",
-        },
+        _YANDEX_HOST,
+        "/1.x/?" + urlencode(params),
+        headers=_JSON_HEADERS,
         timeout=15,
     )
-    members = (
-        data.get("response", {})
-        .get("GeoObjectCollection", {})
-        .get("featureMember", [])
-    )
-    if not members:
+    try:
+        pos = data["response"]["GeoObjectCollection"]["featureMember"][0]["GeoObject"]["Point"]["pos"]
+    except (KeyError, IndexError, TypeError):
         return None
-    pos = (
-        members[0]
-        .get("GeoObject", {})
-        .get("Point", {})
-        .get("pos")
-    )
     if not pos:
         return None
     # Yandex returns "lon lat"
@@ -187,13 +464,8 @@ def _nominatim_geocode(addr: str, lang: str = "ru", email: str | None = None) ->
         "limit": "1",
         "accept-language": lang,
     }
-    url = "https://nominatim.openstreetmap.org/search?" + urlencode(params)
-    headers = {
-        "User-Agent": _user_agent(email),
-        "Accept-Language": lang,
-        "Accept": "application/json",
-    }
-    arr = _fetch_json(url, headers=headers, timeout=20)
+    headers = _nominatim_headers(lang, email)
+    arr = _fetch_json(_NOMINATIM_HOST, "/search?" + urlencode(params), headers=headers, timeout=20)
     if not arr:
         return None
     lat = float(arr[0]["lat"])  # lat
@@ -201,31 +473,39 @@ def _nominatim_geocode(addr: str, lang: str = "ru", email: str | None = None) ->
     return lat, lon
 
 
-def _photon_geocode(addr: str, lang: str = "ru") -> tuple[float, float] | None:
-    supported_langs = {"default", "en", "de", "fr"}
-    lang_param = lang if lang in supported_langs else "default"
-    import re
+def _normalize_variant(text: str) -> str:
+    cleaned = " ".join(text.replace(",", " ").split())
+    return cleaned.strip()
+
 
-    def _normalize_variant(text: str) -> str:
-        cleaned = " ".join(text.replace(",", " ").split())
-        return cleaned.strip()
+def _separate_suffixes(text: str) -> str:
+    for pattern, repl in _SUFFIX_RES:
+        text = pattern.sub(repl, text)
+    return text
 
-    def _separate_suffixes(text: str) -> str:
-        tmp = re.sub(r"(\d[^\s,]*)\s*([сc])(?=\d)", r"\1 \2", text, flags=re.IGNORECASE)
-        tmp = re.sub(r"([сc])\s*(\d+)", r"\1 \2", tmp, flags=re.IGNORECASE)
-        tmp = re.sub(r"([кk])\s*(\d+)", r"\1 \2", tmp, flags=re.IGNORECASE)
-        tmp = re.sub(r"(стр(?:\.|оение)?)\s*(\d+)", r"стр \2", tmp, flags=re.IGNORECASE)
-        return tmp
 
-    def _normalized_house(value: str) -> str:
-        return re.sub(r"[^0-9a-zа-я]", "", value.lower())
+def _normalized_house(value: str) -> str:
+    return _HOUSE_NORMALIZE_RE.sub("", value.lower())
 
+
+@functools.lru_cache(maxsize=4096)
+def _photon_prep(
+    addr: str,
+) -> tuple[tuple[str, ...], frozenset[str], "re.Pattern[str] | None", str]:
+    """
+    Build the Photon query variants, normalized house tokens (plus a single
+    pattern matching any of them) and lowercased address for `addr`.
+    Memoized because the fallback chain in geocode_to_coords can send the
+    same address to Photon more than once.
+    """
     base_variant = _normalize_variant(addr)
     variants: list[str] = []
+    seen: set[str] = set()
 
     def _add_variant(text: str):
         norm = _normalize_variant(text)
-        if norm and norm not in variants:
+        if norm and norm not in seen:
+            seen.add(norm)
             variants.append(norm)
 
     _add_variant(addr)
@@ -238,38 +518,45 @@ def _photon_geocode(addr: str, lang: str = "ru") -> tuple[float, float] | None:
             _add_variant(reordered)
             _add_variant(_separate_suffixes(reordered))
 
-    headers = {
-        "User-Agent": _user_agent(),
-        "Accept": "application/json",
-    }
     address_lower = base_variant.lower()
     house_tokens = set()
-    for token in re.findall(r"\d+[^\s,]*", addr):
+    for token in _HOUSE_TOKEN_RE.findall(addr):
         normalized = _normalized_house(token)
         if normalized:
             house_tokens.add(normalized)
+    house_re = None
+    if house_tokens:
+        house_re = re.compile("|".join(re.escape(token) for token in house_tokens))
+    return tuple(variants), frozenset(house_tokens), house_re, address_lower
+
+
+def _photon_geocode(addr: str, lang: str = "ru") -> tuple[float, float] | None:
+    supported_langs = {"default", "en", "de", "fr"}
+    lang_param = lang if lang in supported_langs else "default"
+    variants, house_tokens, house_re, address_lower = _photon_prep(addr)
 
     best_coords: tuple[float, float] | None = None
     best_score = -1.0
+    last_error: Exception | None = None
     for variant in variants:
         params = {
             "q": variant,
             "limit": "15",
             "lang": lang_param,
         }
-        url = "https://photon.komoot.io/api/?" + urlencode(params)
         try:
-            data = _fetch_json(url, headers=headers, timeout=20)
-        except _GEOCODE_EXCEPTIONS:
+            data = _fetch_json(_PHOTON_HOST, "/api/?" + urlencode(params), headers=_JSON_HEADERS, timeout=20)
+        except _GEOCODE_EXCEPTIONS as exc:
+            last_error = exc
             continue
         features = data.get("features") if isinstance(data, dict) else None
         if not features:
             continue
         for feature in features:
-            if not isinstance(feature, dict):
+            try:
+                coords = feature["geometry"]["coordinates"]
+            except (KeyError, TypeError):
                 continue
-            geometry = feature.get("geometry", {})
-            coords = geometry.get("coordinates")
             if not (isinstance(coords, list) and len(coords) >= 2):
                 continue
             props = feature.get("properties", {})
@@ -281,11 +568,8 @@ def _photon_geocode(addr: str, lang: str = "ru") -> tuple[float, float] | None:
                 normalized_house = _normalized_house(str(house))
                 if normalized_house in house_tokens:
                     score += 5.0
-                else:
-                    for token in house_tokens:
-                        if token and token in normalized_house:
-                            score += 3.0
-                            break
+                elif house_re is not None and house_re.search(normalized_house):
+                    score += 3.0
             street = (props.get("street") or "").lower()
             if street and street in address_lower:
                 score += 1.0
@@ -309,6 +593,9 @@ def _photon_geocode(addr: str, lang: str = "ru") -> tuple[float, float] | None:
                 best_score = score
                 if score >= 5.0:
                     return best_coords
+    if best_coords is None and last_error is not None:
+        # Let the caller tell "not found" apart from "Photon unreachable"
+        raise last_error
     return best_coords
 
 
@@ -319,61 +606,100 @@ def geocode_to_coords(
     apikey: str | None = None,
     lang: str = "ru_RU",
 ) -> tuple[float, float] | None:
-    cache = _load_cache()
-    prefer_key = f"{prefer}:{addr}"
-    cache_keys = [prefer_key, addr]
-    for key in cache_keys:
-        cached = cache.get(key)
-        if isinstance(cached, list) and len(cached) == 2:
-            return float(cached[0]), float(cached[1])
+    global _CACHE_DIRTY
+    with _CACHE_LOCK:
+        cache = _load_cache()
+    key = _cache_key(addr)
+    now = int(time.time())
+    cached = cache.get(key)
+    if isinstance(cached, list) and len(cached) == 2:
+        return float(cached[0]), float(cached[1])
+    if isinstance(cached, dict):
+        failed_at = cached.get("fail")
+        # A miss recorded without a Yandex key doesn't count once a key is given
+        asked_all = cached.get("yandex") is True or not apikey
+        if isinstance(failed_at, (int, float)) and now - failed_at < _NEGATIVE_CACHE_TTL and asked_all:
+            return None
     prefer_normalized = (prefer or "").lower()
     lang_short = lang.split("_")[0] if lang else "en"
     email = os.environ.get("NOMINATIM_EMAIL")
 
-    def _try(callable_obj):
-        try:
-            return callable_obj()
-        except _GEOCODE_EXCEPTIONS:
-            return None
-
-    result: tuple[float, float] | None = None
+    # Providers in fallback order; the first one returning coordinates wins.
+    # Photon is always the last resort.
     if prefer_normalized == "yandex":
-        if apikey:
-            result = _try(lambda: _yandex_geocode(addr, apikey, lang=lang))
-        if result is None:
-            result = _try(lambda: _nominatim_geocode(addr, lang=lang_short, email=email))
+        chain = ("yandex", "nominatim", "photon")
     elif prefer_normalized == "photon":
-        result = _try(lambda: _photon_geocode(addr, lang=lang_short))
-        if result is None and apikey:
-            result = _try(lambda: _yandex_geocode(addr, apikey, lang=lang))
-        if result is None:
-            result = _try(lambda: _nominatim_geocode(addr, lang=lang_short, email=email))
-    else:
-        result = _try(lambda: _nominatim_geocode(addr, lang=lang_short, email=email))
-        if result is None and apikey:
-            result = _try(lambda: _yandex_geocode(addr, apikey, lang=lang))
-
-    if result is None:
-        result = _try(lambda: _photon_geocode(addr, lang=lang_short))
-
-    if result is not None:
-        lat_val = float(result[0])
-        lon_val = float(result[1])
-        for key in cache_keys:
-            cache[key] = [lat_val, lon_val]
-        _save_cache(cache)
+        chain = ("photon", "yandex", "nominatim", "photon")
     else:
-        # Remove stale failure entries to allow future retries with new data
-        modified = False
-        for key in cache_keys:
-            if key in cache and not isinstance(cache[key], list):
-                cache.pop(key, None)
-                modified = True
-        if modified:
-            _save_cache(cache)
+        chain = ("nominatim", "yandex", "photon")
+
+    result: tuple[float, float] | None = None
+    request_failed = False
+    for provider in chain:
+        try:
+            if provider == "yandex":
+                if not apikey:
+                    continue
+                result = _yandex_geocode(addr, apikey, lang=lang)
+            elif provider == "nominatim":
+                result = _nominatim_geocode(addr, lang=lang_short, email=email)
+            else:
+                result = _photon_geocode(addr, lang=lang_short)
+        except _GEOCODE_EXCEPTIONS:
+            request_failed = True
+            result = None
+        if result is not None:
+            break
+
+    with _CACHE_LOCK:
+        if result is not None:
+            cache[key] = [float(result[0]), float(result[1])]
+            _CACHE_DIRTY = True
+        elif isinstance(cache.get(key), list):
+            # Another worker resolved the same canonical address meanwhile;
+            # never replace good coordinates with a failure.
+            pass
+        elif _NEGATIVE_CACHE_TTL and not request_failed:
+            # Every geocoder that was asked answered but none found the
+            # address: remember that for a while so later runs skip the
+            # network round-trips. Yandex is only asked when a key is set.
+            cache[key] = {"fail": now, "yandex": bool(apikey)}
+            _CACHE_DIRTY = True
+        elif key in cache:
+            # Remove stale failure entries to allow future retries with new data
+            cache.pop(key)
+            _CACHE_DIRTY = True
     return result
 
 
+def geocode_batch(
+    addrs: list[str],
+    *,
+    prefer: str = "yandex",
+    apikey: str | None = None,
+    lang: str = "ru_RU",
+    workers: int = 4,
+) -> dict[str, tuple[float, float] | None]:
+    """
+    Geocode a list of addresses and return a mapping address -> coords.
+    None of the supported geocoders has a bulk endpoint, so the batch is
+    spread over worker threads that share keep-alive connections (and the
+    per-host rate limits); addresses sharing a cache key are looked up once.
+    """
+    by_key: dict[str, str] = {}
+    for addr in addrs:
+        by_key.setdefault(_cache_key(addr), addr)
+    if not by_key:
+        return {}
+
+    def _one(addr: str):
+        return geocode_to_coords(addr, prefer=prefer, apikey=apikey, lang=lang)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(by_key)))) as executor:
+        results = dict(zip(by_key, executor.map(_one, by_key.values())))
+    return {addr: results[_cache_key(addr)] for addr in addrs}
+
+
 def _parse_label_and_target(raw: str):
     # Supports two formats:
     # 1) "Address text"  -> label=raw, target=raw
@@ -388,6 +714,13 @@ def _parse_label_and_target(raw: str):
     return raw.strip(), raw.strip()
 
 
+def _csv_field(value: str) -> str:
+    # Same quoting as csv.writer's default QUOTE_MINIMAL dialect
+    if '"' in value or "," in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
 def main(argv):
     import argparse
 
@@ -430,6 +763,12 @@ def main(argv):
         default="pairs",
         help="Output format: csv (Address,Link) or pairs (Address/Link) per line",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of addresses geocoded in parallel (default: 4)",
+    )
 
     args = parser.parse_args(argv)
 
@@ -439,32 +778,43 @@ def main(argv):
         return 2
 
     encoding_used, lines = read_lines_with_fallback(in_path)
-    # Filter out empty/comment lines
-    addresses = [ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith("#")]
+    # Strip and filter out empty/comment lines in one pass
+    addresses = [ln for ln in (raw.strip() for raw in lines) if ln and not ln.startswith("#")]
 
-    rows = []
+    queries = []
     for raw in addresses:
         label, target = _parse_label_and_target(raw)
-        # Geocode non-coordinate targets
+        query = None
         if not _is_coords(target):
             query = (args.prepend + target) if args.prepend else target
-            coords = geocode_to_coords(query, prefer=args.geocoder, apikey=(args.apikey or None))
-            if coords:
-                target = f"{coords[0]},{coords[1]}"
+        queries.append((label, target, query))
+
+    # Geocode non-coordinate targets
+    coords_by_query = geocode_batch(
+        [query for _, _, query in queries if query is not None],
+        prefer=args.geocoder,
+        apikey=(args.apikey or None),
+        workers=args.workers,
+    )
+    flush_cache()
+
+    rows = []
+    for label, target, query in queries:
+        coords = coords_by_query.get(query) if query is not None else None
+        if coords:
+            target = f"{coords[0]},{coords[1]}"
         target_for_link = _coords_to_2gis_order(target)
-        link = build_2gis_link(target_for_link)
-        rows.append((label, link))
+        rows.append((label, build_2gis_link(target_for_link)))
 
     out_path = Path(args.output)
     if args.format == "csv":
+        out = ["Address,TwoGISLink\r\n"]
+        out.extend(f"{_csv_field(a)},{_csv_field(l)}\r\n" for a, l in rows)
         with out_path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Address", "TwoGISLink"])
-            writer.writerows(rows)
+            f.write("".join(out))
     else:
         with out_path.open("w", encoding="utf-8") as f:
-            for a, l in rows:
-                f.write(f"{a}/{l}\n\n")
+            f.write("".join(f"{a}/{l}\n\n" for a, l in rows))
 
     # Also echo a short summary to stdout
     print(f"Read {len(addresses)} addresses from {in_path} (encoding: {encoding_used}).")